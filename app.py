@@ -1,10 +1,71 @@
+import ast
+import atexit
+import hashlib
+
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
+import ofdm_estimation
+import ofdma_estimation
 from ofdm_estimation import estimate_ofdm_throughput
 from ofdma_estimation import estimate_ofdma_throughput
+from werkzeug.exceptions import RequestEntityTooLarge
+from jobs import JobManager, JobRejected, MAX_RESULT_PAGE, MAX_JOB_BODY_BYTES
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all origins
+app.config['MAX_CONTENT_LENGTH'] = MAX_JOB_BODY_BYTES  # Bounds request bodies (job specs)
+
+# Long sweeps and batches run on a bounded process pool instead of inside a request
+job_manager = JobManager()
+atexit.register(job_manager.shutdown)  # Spooled results do not outlive the server
+
+# /api/estimate is a pure function of its query string, so responses may be cached by
+# browsers, the reverse proxy and CDN edges. The ETag is bound to MODEL_VERSION, so any
+# change to the estimator code or constants invalidates previously cached entries.
+ESTIMATE_CACHE_CONTROL = 'public, max-age=3600, stale-while-revalidate=86400'
+
+def _is_main_guard(node):
+    return (isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+            and isinstance(node.test.left, ast.Name) and node.test.left.id == '__name__')
+
+def compute_model_version():
+    """
+    Hashes the code of ofdm_estimation.py and ofdma_estimation.py: every constant, literal
+    and operation, but not docstrings, comments, message strings or the __main__ block.
+    Built from the parsed source rather than bytecode, so it is the same on every Python
+    version and all servers behind a CDN agree on the ETag.
+    """
+    digest = hashlib.sha256()
+    for module in (ofdm_estimation, ofdma_estimation):
+        with open(module.__file__, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        tree.body = [node for node in tree.body if not _is_main_guard(node)]
+        parts = [module.__name__]
+        for node in ast.walk(tree):
+            parts.append(type(node).__name__)
+            if isinstance(node, ast.Constant) and not isinstance(node.value, str):
+                parts.append(repr(node.value))
+            elif isinstance(node, ast.Name):
+                parts.append(node.id)
+            elif isinstance(node, ast.Attribute):
+                parts.append(node.attr)
+            elif isinstance(node, ast.FunctionDef):
+                parts.append(node.name)
+        digest.update('|'.join(parts).encode())
+    return digest.hexdigest()[:16]
+
+MODEL_VERSION = compute_model_version()
+
+def estimate_etag(channel_type, spectrum, mod_order, spacing, guard, exclude):
+    """Deterministic ETag from the canonicalized (parsed) parameters and MODEL_VERSION."""
+    canonical = (f"type={channel_type}&spectrum={spectrum!r}&modOrder={mod_order!r}"
+                 f"&spacing={spacing!r}&guard={guard!r}&exclude={exclude!r}")
+    return hashlib.sha256(f"{MODEL_VERSION}|{canonical}".encode()).hexdigest()[:32]
+
+def cacheable(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = ESTIMATE_CACHE_CONTROL
+    return response
 
 @app.route('/')
 def home():
@@ -26,19 +87,84 @@ def estimate():
         if spectrum <= 0 or mod_order <= 0 or spacing <= 0:
             return jsonify({'error': 'Spectrum, modulation order, and spacing must be positive numbers.'}), 400
 
+        if channel_type not in ('ofdm', 'ofdma'):
+            return jsonify({'error': f'Unsupported channel type: {channel_type}'}), 400
+
+        # Answer conditional GETs before doing any estimation work. If-None-Match uses weak
+        # comparison (RFC 7232 3.2); compressing proxies rewrite our ETag to W/"..."
+        etag = estimate_etag(channel_type, spectrum, mod_order, spacing, guard, exclude)
+        if request.if_none_match.contains_weak(etag):
+            return cacheable(app.response_class(status=304), etag)
+
         if channel_type == 'ofdm':
             throughput = estimate_ofdm_throughput(spectrum, mod_order, spacing, guard, exclude)
-        elif channel_type == 'ofdma':
-            throughput = estimate_ofdma_throughput(spectrum, mod_order, spacing, guard, exclude)
         else:
-            return jsonify({'error': f'Unsupported channel type: {channel_type}'}), 400
+            throughput = estimate_ofdma_throughput(spectrum, mod_order, spacing, guard, exclude)
 
         print(f"Calculated throughput: {throughput}")
 
-        return jsonify({'throughput': round(throughput, 3)})
+        return cacheable(jsonify({'throughput': round(throughput, 3)}), etag)
     except Exception as e:
         print(f"Exception in estimate: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    try:
+        job_manager.check_admission()  # Before the body is read or parsed
+        spec = request.get_json(silent=True)
+        if spec is None:
+            return jsonify({'error': 'Request body must be a JSON job spec.'}), 400
+        job = job_manager.submit(spec)
+        print(f"Submitted job {job.id}: type={job.channel_type}, kind={job.kind}, rows={job.total_rows}")
+        response = jsonify(job.status())
+        response.headers['Location'] = f'/api/jobs/{job.id}'
+        return response, 202
+    except JobRejected as e:
+        return jsonify({'error': str(e)}), e.http_status
+    except RequestEntityTooLarge:
+        return jsonify({'error': f'Job spec exceeds {MAX_JOB_BODY_BYTES} bytes.'}), 413
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Exception in submit_job: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    try:
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({'error': f'Unknown job: {job_id}'}), 404
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', 0))
+        if offset < 0 or limit < 0:
+            return jsonify({'error': 'offset and limit must be non-negative.'}), 400
+        status = job.status()
+        if limit:
+            # Partial results are available as soon as their chunk has been spooled
+            status['results'] = job.read_results(offset, min(limit, MAX_RESULT_PAGE))
+            status['offset'] = offset
+        return jsonify(status)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Exception in job_status: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    return jsonify(job.status()), 202
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    job = job_manager.delete(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    return jsonify({'id': job_id, 'deleted': True})
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
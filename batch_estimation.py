@@ -0,0 +1,203 @@
+"""
+Vectorized (NumPy) versions of estimate_ofdm_throughput and estimate_ofdma_throughput.
+
+Each function takes scalars or arrays (broadcast against each other) and returns a dict of
+1-D NumPy arrays: the inputs plus the derived intermediates (effective subcarriers, full
+codewords, minislot counts, ...) and the final rate. Row for row, the rates are identical to
+the scalar estimators.
+
+Requires NumPy (imported here only; the estimation core does not depend on it).
+"""
+import numpy as np
+
+from ofdm_estimation import (
+    SAMPLING_RATE_MHZ, CYCLIC_PREFIX_SAMPLES, NUM_FFT_BLOCKS, PILOT_DENSITY_M,
+    EXCLUDED_SUBCARRIERS_CONST, NCP_MODULATION_ORDER_BITS, NUM_SYMBOLS_PER_PROFILE, LDPC_FEC_CW
+)
+from ofdma_estimation import (
+    minislot_patterns,
+    US_CHANNEL_WIDTH_MHZ_50KHZ, US_CHANNEL_WIDTH_MHZ_25KHZ, US_PILOT_PATTERN_50KHZ, US_PILOT_PATTERN_25KHZ,
+    US_MINISLOT_SUBCARRIERS_Q_50KHZ, US_MINISLOT_SUBCARRIERS_Q_25KHZ, US_K_NBI_50KHZ, US_K_NBI_25KHZ,
+    US_SAMPLING_RATE_MSPS, US_CYCLIC_PREFIX_SAMPLES, US_MINISLOT_SYMBOLS_K, US_NUM_CONT_LEGACY,
+    US_EXCLUDED_NBI, US_ADDNL_EDGE_MINISLOT, US_NUM_GRANTS_IN_PROFILE, US_SUBCARRIERS_PER_EXCL_GAP
+)
+
+# minislot_patterns as an array: columns are [Pattern ID, Q, CP_flag, Pilots_P, Pilots_CP/Secondary]
+PATTERN_TABLE = np.array(minislot_patterns, dtype=np.int64)
+
+
+def broadcast_inputs(*values):
+    """Broadcasts scalars/arrays against each other into contiguous 1-D float64 arrays."""
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in values))
+    return [np.ascontiguousarray(a).ravel() for a in arrays]
+
+
+def minislot_capacity_batch(K_symbols, current_modulation_order, pattern_array_index):
+    """Vectorized minislot_capacity(); all arguments broadcast against each other."""
+    patterns = PATTERN_TABLE[np.asarray(pattern_array_index)]
+    q = patterns[..., 1]
+    cp_flag = patterns[..., 2]
+    primary_pilots = patterns[..., 3]
+    cp_pilots = patterns[..., 4]
+    mod = np.asarray(current_modulation_order, dtype=np.float64)
+
+    cp_modulation_order = np.maximum(mod - 4, 1)
+    data_subcarriers = np.asarray(K_symbols, dtype=np.float64) * q - primary_pilots - cp_pilots
+    return mod * data_subcarriers + cp_flag * cp_modulation_order * cp_pilots
+
+
+def estimate_ofdm_batch(spectrum, mod_order, spacing, guard, exclude):
+    """
+    Vectorized estimate_ofdm_throughput.
+
+    Returns:
+        dict of np.ndarray: 'spectrum', 'mod_order', 'spacing', 'guard', 'exclude',
+        'actual_symbol_period_usec', 'modulated_subcarriers', 'effective_subcarriers',
+        'num_full_codewords', 'shortened_cw_data_bits', 'total_data_bits', 'rate_gbps'.
+        Derived columns are 0 for rows where the scalar estimator returns 0.0.
+    """
+    spectrum, mod_order, spacing, guard, exclude = broadcast_inputs(spectrum, mod_order, spacing, guard, exclude)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        symbol_period_usec = 1000.0 / spacing
+        cyclic_prefix_usec = CYCLIC_PREFIX_SAMPLES / SAMPLING_RATE_MHZ
+        actual_symbol_period_usec = symbol_period_usec + cyclic_prefix_usec
+
+        active_spectrum_mhz = spectrum - guard - exclude
+        modulated_subcarriers = active_spectrum_mhz * 1000.0 / spacing
+
+        num_plc_subcarriers = np.where(spacing == 50, 8, 16)
+        num_cont_pilots_basic = np.ceil(PILOT_DENSITY_M * spectrum / 190.0)
+        num_cont_pilots = np.minimum(np.maximum(8, num_cont_pilots_basic), 120) + 8
+        subcarriers_for_scattered_calc = np.maximum(modulated_subcarriers - num_plc_subcarriers, 0)
+        num_scattered_pilots = np.ceil(subcarriers_for_scattered_calc / 128.0)
+
+        effective_subcarriers = modulated_subcarriers - (EXCLUDED_SUBCARRIERS_CONST +
+                                                         num_plc_subcarriers * NUM_FFT_BLOCKS +
+                                                         num_cont_pilots +
+                                                         num_scattered_pilots)
+
+    valid = (spacing != 0) & (active_spectrum_mhz > 0) & (effective_subcarriers > 0) & (actual_symbol_period_usec != 0)
+    effective_subcarriers = np.where(valid, effective_subcarriers, 0.0)
+
+    ldpc_cw_size_bits = LDPC_FEC_CW[0]
+    ldpc_info_bits_per_cw = LDPC_FEC_CW[1]
+    subcarriers_per_ncp_mb = 48 / NCP_MODULATION_ORDER_BITS
+
+    num_bits_in_data_subcarriers = effective_subcarriers * mod_order
+    if NUM_SYMBOLS_PER_PROFILE > 1:
+        num_bits_in_data_subcarriers *= NUM_SYMBOLS_PER_PROFILE
+    num_full_codewords = np.floor(num_bits_in_data_subcarriers / ldpc_cw_size_bits)
+    num_ncp_mbs = num_full_codewords + np.ceil(NUM_SYMBOLS_PER_PROFILE)
+
+    subcarriers_for_data_and_shortened_cw = np.maximum(
+        (NUM_SYMBOLS_PER_PROFILE * effective_subcarriers) - ((num_ncp_mbs + 1) * subcarriers_per_ncp_mb), 0)
+    bits_for_data_and_shortened_cw = subcarriers_for_data_and_shortened_cw * mod_order
+    remaining_bits_for_shortened_cw_raw = bits_for_data_and_shortened_cw - (ldpc_cw_size_bits * num_full_codewords)
+    parity_bits_in_full_cw = ldpc_cw_size_bits - ldpc_info_bits_per_cw
+    shortened_cw_data_bits = np.maximum(0, remaining_bits_for_shortened_cw_raw - parity_bits_in_full_cw)
+
+    total_data_bits = (num_full_codewords * ldpc_info_bits_per_cw) + shortened_cw_data_bits
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate_gbps = total_data_bits / (actual_symbol_period_usec * NUM_SYMBOLS_PER_PROFILE * 1000.0)
+
+    return {
+        'spectrum': spectrum,
+        'mod_order': mod_order,
+        'spacing': spacing,
+        'guard': guard,
+        'exclude': exclude,
+        'actual_symbol_period_usec': np.where(spacing != 0, actual_symbol_period_usec, 0.0),
+        'modulated_subcarriers': np.where(valid, modulated_subcarriers, 0.0),
+        'effective_subcarriers': effective_subcarriers,
+        'num_full_codewords': np.where(valid, num_full_codewords, 0).astype(np.int64),
+        'shortened_cw_data_bits': np.where(valid, shortened_cw_data_bits, 0.0),
+        'total_data_bits': np.where(valid, total_data_bits, 0.0),
+        'rate_gbps': np.where(valid, rate_gbps, 0.0),
+    }
+
+
+def ofdma_minislot_layout_batch(spectrum, spacing, guard, exclude):
+    """
+    Vectorized ofdma_minislot_layout.
+
+    Returns:
+        tuple of np.ndarray: (num_body_minislots, num_edge_minislots, minislot_subcarriers_q,
+                              actual_symbol_period_usec)
+    """
+    spectrum, spacing, guard, exclude = broadcast_inputs(spectrum, spacing, guard, exclude)
+
+    is_25khz = spacing == 25
+    derived_channel_width_mhz = np.where(is_25khz, US_CHANNEL_WIDTH_MHZ_25KHZ, US_CHANNEL_WIDTH_MHZ_50KHZ)
+    us_minislot_subcarriers_q = np.where(is_25khz, US_MINISLOT_SUBCARRIERS_Q_25KHZ, US_MINISLOT_SUBCARRIERS_Q_50KHZ)
+    k_nbi_factor = np.where(is_25khz, US_K_NBI_25KHZ, US_K_NBI_50KHZ)
+
+    us_occupied_spectrum_mhz = (spectrum + derived_channel_width_mhz) - spectrum
+    with np.errstate(divide='ignore', invalid='ignore'):
+        us_cyclic_prefix_usec = US_CYCLIC_PREFIX_SAMPLES / US_SAMPLING_RATE_MSPS
+        us_actual_symbol_period_usec = 1000.0 / spacing + us_cyclic_prefix_usec
+
+        us_total_subcarriers = 1000.0 * us_occupied_spectrum_mhz / spacing
+        us_excluded_subcarriers = 1000.0 * (exclude + guard) / spacing + (US_EXCLUDED_NBI * k_nbi_factor)
+        us_num_of_excl_spectrum_gaps = US_EXCLUDED_NBI + US_NUM_CONT_LEGACY
+        us_actual_signal_subcarriers = us_total_subcarriers - us_excluded_subcarriers
+
+        us_temp_num_minislots = np.floor(us_actual_signal_subcarriers / us_minislot_subcarriers_q)
+        us_minislot_efficiency = (us_actual_signal_subcarriers - us_num_of_excl_spectrum_gaps * US_SUBCARRIERS_PER_EXCL_GAP) / us_actual_signal_subcarriers
+        # np.rint rounds half to even, like the built-in round() used by the scalar estimator
+        us_num_minislots = np.rint(us_minislot_efficiency * us_temp_num_minislots)
+
+    valid_channel = (us_occupied_spectrum_mhz > 0) & (spacing != 0) & (us_actual_symbol_period_usec != 0)
+    valid = valid_channel & (us_actual_signal_subcarriers > 0) & (us_num_minislots > 0)
+    us_num_minislots = np.where(valid, us_num_minislots, 0).astype(np.int64)
+
+    us_num_of_edge_minislots = np.minimum(US_NUM_GRANTS_IN_PROFILE + US_ADDNL_EDGE_MINISLOT, us_num_minislots)
+    us_num_of_body_minislots = us_num_minislots - us_num_of_edge_minislots
+
+    return (us_num_of_body_minislots, us_num_of_edge_minislots, us_minislot_subcarriers_q.astype(np.int64),
+            np.where(valid_channel, us_actual_symbol_period_usec, 0.0))
+
+
+def estimate_ofdma_batch(spectrum, mod_order, spacing, guard, exclude):
+    """
+    Vectorized estimate_ofdma_throughput.
+
+    Returns:
+        dict of np.ndarray: 'spectrum', 'mod_order', 'spacing', 'guard', 'exclude',
+        'actual_symbol_period_usec', 'minislot_subcarriers_q', 'num_body_minislots',
+        'num_edge_minislots', 'body_pattern_idx', 'edge_pattern_idx', 'capacity_bits', 'rate_mbps'.
+    """
+    spectrum, mod_order, spacing, guard, exclude = broadcast_inputs(spectrum, mod_order, spacing, guard, exclude)
+    num_body, num_edge, q, symbol_period = ofdma_minislot_layout_batch(spectrum, spacing, guard, exclude)
+
+    us_pilot_pattern_idx = np.where(spacing == 25, US_PILOT_PATTERN_25KHZ, US_PILOT_PATTERN_50KHZ)
+    body_pattern_idx = us_pilot_pattern_idx - 1 + np.where(q == 16, 7, 0)
+    edge_pattern_idx = body_pattern_idx + 7
+
+    capacity_bits = (num_body * minislot_capacity_batch(US_MINISLOT_SYMBOLS_K, mod_order, body_pattern_idx) +
+                     num_edge * minislot_capacity_batch(US_MINISLOT_SYMBOLS_K, mod_order, edge_pattern_idx))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate_mbps = capacity_bits / (US_MINISLOT_SYMBOLS_K * symbol_period)
+    rate_mbps = np.where((num_body + num_edge > 0) & (symbol_period != 0), rate_mbps, 0.0)
+
+    return {
+        'spectrum': spectrum,
+        'mod_order': mod_order,
+        'spacing': spacing,
+        'guard': guard,
+        'exclude': exclude,
+        'actual_symbol_period_usec': symbol_period,
+        'minislot_subcarriers_q': q,
+        'num_body_minislots': num_body,
+        'num_edge_minislots': num_edge,
+        'body_pattern_idx': body_pattern_idx,
+        'edge_pattern_idx': edge_pattern_idx,
+        'capacity_bits': np.where(rate_mbps != 0, capacity_bits, 0.0),
+        'rate_mbps': rate_mbps,
+    }
+
+
+ESTIMATORS = {
+    'ofdm': estimate_ofdm_batch,
+    'ofdma': estimate_ofdma_batch,
+}
@@ -0,0 +1,112 @@
+"""
+Lightweight one-shot estimator entry point.
+
+Loads only the estimation core (ofdm_estimation.py / ofdma_estimation.py), never Flask,
+flask_cors or NumPy, and prints a single number. Intended for CLI use, cron jobs and
+serverless functions where interpreter cold-start dominates the cost of an estimate.
+
+Run: python3 estimate.py ofdm --spectrum 192 --mod-order 12 --spacing 50 --guard 2 --exclude 2
+Run: python3 estimate.py --check-import-budget
+
+From Python:
+    from estimate import estimate
+    estimate('ofdma', spectrum=10, mod_order=10, spacing=50, guard=0.8, exclude=0)
+"""
+import sys
+
+# Cold-start budget for importing this module plus both estimator modules in a fresh
+# interpreter (interpreter startup itself is excluded).
+IMPORT_BUDGET_MS = 50.0
+
+# Modules that must never be pulled in by the lightweight path
+HEAVY_MODULES = ('flask', 'flask_cors', 'numpy', 'pyarrow')
+
+ESTIMATORS = {
+    'ofdm': ('ofdm_estimation', 'estimate_ofdm_throughput', 'Gbps'),
+    'ofdma': ('ofdma_estimation', 'estimate_ofdma_throughput', 'Mbps'),
+}
+
+def load_estimator(channel_type):
+    """Imports only the estimator module needed for channel_type and returns its estimate function."""
+    if channel_type not in ESTIMATORS:
+        raise ValueError(f"Unsupported channel type: {channel_type}")
+    module_name, func_name, _ = ESTIMATORS[channel_type]
+    module = __import__(module_name)
+    return getattr(module, func_name)
+
+def estimate(channel_type, spectrum=192, mod_order=12, spacing=50, guard=2, exclude=2):
+    """
+    Runs a single estimate. Defaults match those of /api/estimate in app.py.
+
+    Returns:
+        float: Gbps for 'ofdm', Mbps for 'ofdma'.
+    """
+    estimator = load_estimator(channel_type)
+    return estimator(spectrum, mod_order, spacing, guard, exclude)
+
+def measure_import_time():
+    """
+    Measures, in a fresh interpreter, the time to import this module and both estimator
+    modules. Returns (elapsed_ms, heavy_modules_loaded).
+    """
+    import os
+    import subprocess
+    probe = (
+        "import sys, time\n"
+        "t0 = time.perf_counter()\n"
+        "import estimate\n"
+        "estimate.load_estimator('ofdm'); estimate.load_estimator('ofdma')\n"
+        "elapsed_ms = (time.perf_counter() - t0) * 1000.0\n"
+        "heavy = [m for m in estimate.HEAVY_MODULES if m in sys.modules]\n"
+        "print(elapsed_ms, ','.join(heavy))\n"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    # -B avoids writing .pyc files, -E ignores PYTHON* environment overrides
+    output = subprocess.run(
+        [sys.executable, '-B', '-E', '-c', probe],
+        cwd=here, capture_output=True, text=True, check=True
+    ).stdout.split()
+    elapsed_ms = float(output[0])
+    heavy = output[1].split(',') if len(output) > 1 else []
+    return elapsed_ms, heavy
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="One-shot OFDM/OFDMA capacity estimate.")
+    parser.add_argument('type', nargs='?', default='ofdm', choices=sorted(ESTIMATORS),
+                        help="Channel type (default: ofdm)")
+    parser.add_argument('--spectrum', type=float, default=192,
+                        help="OFDM: occupied spectrum in MHz. OFDMA: start frequency in MHz.")
+    parser.add_argument('--mod-order', type=float, default=12, help="Modulation order in bits/symbol")
+    parser.add_argument('--spacing', type=float, default=50, help="Subcarrier spacing in kHz (25 or 50)")
+    parser.add_argument('--guard', type=float, default=2, help="Guard band in MHz")
+    parser.add_argument('--exclude', type=float, default=2, help="Excluded spectrum in MHz")
+    parser.add_argument('--check-import-budget', action='store_true',
+                        help=f"Measure cold import time against the {IMPORT_BUDGET_MS:g} ms budget and exit")
+    args = parser.parse_args(argv)
+
+    if args.check_import_budget:
+        elapsed_ms, heavy = measure_import_time()
+        print(f"Import time: {elapsed_ms:.2f} ms (budget {IMPORT_BUDGET_MS:g} ms)")
+        if heavy:
+            print(f"Error: heavy modules imported: {', '.join(heavy)}", file=sys.stderr)
+            return 1
+        if elapsed_ms > IMPORT_BUDGET_MS:
+            print("Error: import time budget exceeded.", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.spectrum <= 0 or args.mod_order <= 0 or args.spacing <= 0:
+        print("Error: Spectrum, modulation order, and spacing must be positive numbers.", file=sys.stderr)
+        return 2
+
+    # Diagnostic prints from the estimators go to stderr so stdout carries only the result.
+    # redirect_stdout swaps the process-wide sys.stdout, so it is only done here in the CLI.
+    import contextlib
+    with contextlib.redirect_stdout(sys.stderr):
+        result = estimate(args.type, args.spectrum, args.mod_order, args.spacing, args.guard, args.exclude)
+    print(f"{result:.6f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
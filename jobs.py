@@ -0,0 +1,491 @@
+"""
+Background job subsystem for large capacity studies (sweeps and batches).
+
+Jobs are split into chunks that run on a bounded process pool, so minutes-long studies never
+block a Flask worker. Each chunk's results are spooled to disk as an Arrow IPC part file
+(columnar_output.ColumnarWriter), which makes partial results readable while the job is still
+running. Admission control caps
+the number of active jobs, rows per job and rows kept in the spool, the pool is kept smaller than the CPU count and
+its workers run at a lower scheduling priority, so interactive /api/estimate traffic is not
+starved.
+
+Job spec (JSON body of POST /api/jobs):
+    Sweep - the Cartesian product of the parameter axes. Each axis is a number, a list,
+    or {"start": ..., "stop": ..., "step": ...} (stop inclusive):
+        {"kind": "sweep", "type": "ofdm",
+         "params": {"spectrum": {"start": 24, "stop": 192, "step": 6}, "modOrder": [8, 10, 12],
+                    "spacing": 50, "guard": 2, "exclude": 2}}
+    Batch - explicit rows:
+        {"kind": "batch", "type": "ofdma",
+         "rows": [{"spectrum": 10, "modOrder": 10, "spacing": 50, "guard": 0.8, "exclude": 0}, ...]}
+    Missing parameters take the /api/estimate defaults.
+"""
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# --- Configuration ---
+MAX_WORKERS = max(1, (os.cpu_count() or 2) - 1) # Leave a core for interactive requests
+MAX_ACTIVE_JOBS = 4                              # Queued + running jobs admitted at once
+MAX_JOB_ROWS = 10_000_000                        # Largest sweep/batch accepted
+CHUNK_ROWS = 50_000                              # Rows per pool task / spool part file
+MAX_RESULT_PAGE = 10_000                         # Largest page of results returned by GET
+MAX_JOB_BODY_BYTES = 64 * 1024 * 1024            # Largest POST /api/jobs body (app.py MAX_CONTENT_LENGTH)
+FINISHED_JOB_TTL_S = 3600                        # Finished jobs and their spool are removed after this
+MAX_FINISHED_JOBS = 100                          # ... or earlier, once more than this many are kept
+MAX_SPOOLED_ROWS = 2 * MAX_JOB_ROWS              # Rows kept on disk across all jobs (~100 bytes/row)
+WORKER_NICENESS = 10                             # Scheduling priority penalty for pool workers
+# Owned by a single server process: job directories left in it are removed at startup
+SPOOL_DIR = os.environ.get('OFDM_JOB_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'ofdm_jobs'))
+
+# Query-string names (as used by /api/estimate) -> estimator argument order, with defaults
+PARAMS = (('spectrum', 192.0), ('modOrder', 12.0), ('spacing', 50.0), ('guard', 2.0), ('exclude', 2.0))
+CHANNEL_TYPES = ('ofdm', 'ofdma')
+RATE_COLUMNS = {'ofdm': 'rate_gbps', 'ofdma': 'rate_mbps'}
+
+ACTIVE_STATES = ('queued', 'running')
+
+
+class JobRejected(Exception):
+    """Raised when admission control refuses a job. http_status is 413 or 429."""
+    def __init__(self, message, http_status):
+        super().__init__(message)
+        self.http_status = http_status
+
+
+# --- Worker side (runs in the process pool) ---
+
+def _init_worker():
+    try:
+        os.nice(WORKER_NICENESS)
+    except (AttributeError, OSError):
+        pass # Not supported on this platform
+
+
+def _run_chunk(channel_type, axes, columns, lo, hi, part_path):
+    """
+    Estimates rows [lo, hi) of a job and spools them to part_path as an Arrow IPC file.
+    For sweeps, axes holds the compact per-chunk axes from _chunk_axes and rows are rebuilt
+    from the grid index; for batches, columns holds the already-sliced input columns.
+    Returns (rows, rate_sum, rate_min, rate_max).
+    """
+    import numpy as np
+    from batch_estimation import ESTIMATORS
+    from columnar_output import ColumnarWriter
+
+    if axes is not None:
+        rows = np.arange(lo, hi)
+        stride = math.prod(axis[-1] for axis in axes)
+        columns = []
+        for axis in axes:
+            stride //= axis[-1]
+            q = rows // stride
+            if axis[0] == 'range':
+                _, start, step, length = axis
+                columns.append(start + (q % length) * step)
+            else:
+                _, first, values, _ = axis
+                columns.append(np.asarray(values, dtype=np.float64)[(q - first) % len(values)])
+    results = ESTIMATORS[channel_type](*columns)
+    rates = results[RATE_COLUMNS[channel_type]]
+
+    tmp_path = part_path + '.tmp'
+    with ColumnarWriter(tmp_path, fmt='arrow') as writer:
+        writer.write(results)
+    os.replace(tmp_path, part_path) # Part files appear atomically
+
+    return len(rates), float(rates.sum()), float(rates.min()), float(rates.max())
+
+
+# --- Job spec parsing ---
+
+def _finite(name, value):
+    """Parses a finite float; NaN and infinity are rejected (they are not valid JSON either)."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be numeric.")
+    if not math.isfinite(number):
+        raise ValueError(f"'{name}' must be a finite number.")
+    return number
+
+
+def _axis_spec(name, value):
+    """
+    Validates one sweep axis without expanding it. Returns either a (start, step, length)
+    range or a list of values.
+    """
+    if isinstance(value, dict):
+        if not all(key in value for key in ('start', 'stop', 'step')):
+            raise ValueError(f"Range for '{name}' needs numeric start, stop and step.")
+        start, stop, step = (_finite(name, value[key]) for key in ('start', 'stop', 'step'))
+        if step <= 0 or stop < start:
+            raise ValueError(f"Range for '{name}' must have step > 0 and stop >= start.")
+        span = (stop - start) / step
+        # Checked before int(), which overflows on an infinite span (e.g. a tiny step)
+        if not math.isfinite(span) or span >= MAX_JOB_ROWS:
+            raise JobRejected(f"Range for '{name}' has more than {MAX_JOB_ROWS} values.", 413)
+        return start, step, int(math.floor(span + 1e-9)) + 1
+    values = value if isinstance(value, list) else [value]
+    if not values:
+        raise ValueError(f"'{name}' must not be empty.")
+    return [_finite(name, v) for v in values]
+
+
+def _axis_length(axis):
+    return axis[2] if isinstance(axis, tuple) else len(axis)
+
+
+def _chunk_axes(axes, lo, hi):
+    """
+    Compact sweep axes for rows [lo, hi), so a chunk never ships the whole grid to a worker.
+    Ranges are sent as ('range', start, step, length). Value lists are cut down to the values
+    those rows use, as ('values', first, values, length): row r uses
+    values[(r // stride - first) % len(values)], where stride is the product of the lengths
+    of the later axes.
+    """
+    chunk_axes = []
+    stride = 1
+    for axis in reversed(axes):
+        length = _axis_length(axis)
+        if isinstance(axis, tuple):
+            chunk_axes.append(('range',) + axis)
+        else:
+            first, last = lo // stride, (hi - 1) // stride
+            if last - first + 1 >= length:
+                chunk_axes.append(('values', 0, axis, length))
+            else:
+                chunk_axes.append(('values', first, [axis[q % length] for q in range(first, last + 1)], length))
+        stride *= length
+    return chunk_axes[::-1]
+
+
+def _validate_columns(name, values):
+    if name in ('spectrum', 'modOrder', 'spacing') and any(v <= 0 for v in values):
+        raise ValueError('Spectrum, modulation order, and spacing must be positive numbers.')
+
+
+def parse_job_spec(spec):
+    """
+    Validates a job spec. Returns (channel_type, axes, columns, total_rows); exactly one of
+    axes (sweep) and columns (batch) is not None. Sizes are checked before anything is expanded.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError('Job spec must be a JSON object.')
+    channel_type = spec.get('type', 'ofdm')
+    if channel_type not in CHANNEL_TYPES:
+        raise ValueError(f'Unsupported channel type: {channel_type}')
+
+    kind = spec.get('kind', 'sweep')
+    if kind == 'sweep':
+        params = spec.get('params', {})
+        if not isinstance(params, dict):
+            raise ValueError("'params' must be an object.")
+        # Ranges stay as (start, step, length) and are never expanded in this process
+        axes = [_axis_spec(name, params.get(name, default)) for name, default in PARAMS]
+        total_rows = math.prod(_axis_length(axis) for axis in axes)
+        if total_rows > MAX_JOB_ROWS:
+            raise JobRejected(f'Job has {total_rows} rows; the limit is {MAX_JOB_ROWS}.', 413)
+        for (name, _), axis in zip(PARAMS, axes):
+            # Ranges are increasing, so their start is their smallest value
+            _validate_columns(name, [axis[0]] if isinstance(axis, tuple) else axis)
+        columns = None
+    elif kind == 'batch':
+        rows = spec.get('rows')
+        if not isinstance(rows, list) or not rows:
+            raise ValueError("'rows' must be a non-empty list.")
+        if len(rows) > MAX_JOB_ROWS:
+            raise JobRejected(f'Job has {len(rows)} rows; the limit is {MAX_JOB_ROWS}.', 413)
+        if not all(isinstance(row, dict) for row in rows):
+            raise ValueError('Each row must be an object with numeric parameters.')
+        columns = [[_finite(name, row.get(name, default)) for row in rows] for name, default in PARAMS]
+        for (name, _), values in zip(PARAMS, columns):
+            _validate_columns(name, values)
+        total_rows = len(rows)
+        axes = None
+    else:
+        raise ValueError(f'Unsupported job kind: {kind}')
+
+    if total_rows > MAX_JOB_ROWS:
+        raise JobRejected(f'Job has {total_rows} rows; the limit is {MAX_JOB_ROWS}.', 413)
+    return channel_type, axes, columns, total_rows
+
+
+# --- Job bookkeeping (runs in the Flask process) ---
+
+class Job:
+    def __init__(self, job_id, channel_type, kind, axes, columns, total_rows, spool_dir):
+        self.id = job_id
+        self.channel_type = channel_type
+        self.kind = kind
+        self.axes = axes
+        self.columns = columns
+        self.total_rows = total_rows
+        self.spool_dir = spool_dir
+        self.num_chunks = math.ceil(total_rows / CHUNK_ROWS)
+        self.state = 'queued'
+        self.error = None
+        self.rows_done = 0
+        self.chunks_done = 0
+        self.rate_sum = 0.0
+        self.rate_min = math.inf
+        self.rate_max = -math.inf
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def part_path(self, chunk):
+        return os.path.join(self.spool_dir, f'part-{chunk:06d}.arrow')
+
+    def chunk_args(self, chunk):
+        lo = chunk * CHUNK_ROWS
+        hi = min(lo + CHUNK_ROWS, self.total_rows)
+        if self.axes is not None:
+            return self.channel_type, _chunk_axes(self.axes, lo, hi), None, lo, hi, self.part_path(chunk)
+        return self.channel_type, None, [values[lo:hi] for values in self.columns], lo, hi, self.part_path(chunk)
+
+    def record_chunk(self, rows, rate_sum, rate_min, rate_max):
+        with self.lock:
+            self.rows_done += rows
+            self.chunks_done += 1
+            self.rate_sum += rate_sum
+            self.rate_min = min(self.rate_min, rate_min)
+            self.rate_max = max(self.rate_max, rate_max)
+
+    def status(self):
+        with self.lock:
+            rate_column = RATE_COLUMNS[self.channel_type]
+            summary = None
+            if self.rows_done:
+                summary = {
+                    'rows': self.rows_done,
+                    f'mean_{rate_column}': self.rate_sum / self.rows_done,
+                    f'min_{rate_column}': self.rate_min,
+                    f'max_{rate_column}': self.rate_max,
+                }
+            return {
+                'id': self.id,
+                'type': self.channel_type,
+                'kind': self.kind,
+                'state': self.state,
+                'error': self.error,
+                'total_rows': self.total_rows,
+                'rows_done': self.rows_done,
+                'progress': self.rows_done / self.total_rows if self.total_rows else 1.0,
+                'chunks_done': self.chunks_done,
+                'num_chunks': self.num_chunks,
+                'summary': summary,
+                'created': self.created,
+                'started': self.started,
+                'finished': self.finished,
+            }
+
+    def spooled_rows(self):
+        """Rows this job holds (or will hold) in the spool, for the admission budget."""
+        return self.total_rows if self.finished is None else self.rows_done
+
+    def read_results(self, offset, limit):
+        """Reads up to limit spooled rows starting at offset, from completed chunks only."""
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        rows = []
+        chunk = offset // CHUNK_ROWS
+        skip = offset % CHUNK_ROWS
+        while len(rows) < limit and chunk < self.num_chunks:
+            path = self.part_path(chunk)
+            if not os.path.exists(path):
+                break # Chunk not finished yet (or job cancelled before reaching it)
+            with pa.memory_map(path) as source:
+                table = pa.ipc.open_file(source).read_all()
+                rows.extend(table.slice(skip, limit - len(rows)).to_pylist())
+            chunk += 1
+            skip = 0
+        return rows
+
+
+class JobManager:
+    """
+    Owns the process pool and the job table. Each job is driven by a thread that keeps at
+    most MAX_WORKERS of its chunks in flight, so concurrent jobs interleave on the pool and
+    cancellation takes effect at the next chunk boundary.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_active_jobs=MAX_ACTIVE_JOBS, spool_dir=SPOOL_DIR):
+        self.max_workers = max_workers
+        self.max_active_jobs = max_active_jobs
+        self.spool_dir = spool_dir
+        self.max_spooled_rows = MAX_SPOOLED_ROWS
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self._pool = None
+        self._remove_orphaned_spools()
+
+    def _remove_orphaned_spools(self):
+        """Removes job directories left in the spool by an earlier server process."""
+        # Spawned pool workers re-import the main module (e.g. app.py) and so construct a
+        # JobManager too; the spool belongs to the server process that owns the pool
+        if multiprocessing.current_process().name != 'MainProcess' or not os.path.isdir(self.spool_dir):
+            return
+        for name in os.listdir(self.spool_dir):
+            path = os.path.join(self.spool_dir, name)
+            # Only uuid4().hex job directories; anything else in the directory is left alone
+            if len(name) == 32 and all(c in '0123456789abcdef' for c in name) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _get_pool(self):
+        with self.lock:
+            if self._pool is None:
+                # 'spawn' avoids forking a multi-threaded web server
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+            return self._pool
+
+    def _check_admission(self, rows=0):
+        # Caller holds self.lock
+        active = sum(1 for job in self.jobs.values() if job.state in ACTIVE_STATES)
+        if active >= self.max_active_jobs:
+            raise JobRejected(f'Too many active jobs ({active}); try again later.', 429)
+        spooled = sum(job.spooled_rows() for job in self.jobs.values())
+        if spooled + rows > self.max_spooled_rows:
+            raise JobRejected(f'Result spool is full ({spooled} of {self.max_spooled_rows} rows); '
+                              'try again later or delete finished jobs.', 429)
+
+    def check_admission(self):
+        """Raises JobRejected (429) if no more jobs can be admitted; cheap enough to call before parsing."""
+        self.evict_finished()
+        with self.lock:
+            self._check_admission()
+
+    def submit(self, spec):
+        # Refuse before parsing, so rejected clients cost nothing; re-checked below because
+        # other jobs may have been admitted while this spec was parsed
+        self.check_admission()
+        channel_type, axes, columns, total_rows = parse_job_spec(spec)
+        self.evict_finished(reserve_rows=total_rows)
+        with self.lock:
+            self._check_admission(total_rows)
+            job_id = uuid.uuid4().hex
+            spool_dir = os.path.join(self.spool_dir, job_id)
+            os.makedirs(spool_dir)
+            job = Job(job_id, channel_type, spec.get('kind', 'sweep'), axes, columns, total_rows, spool_dir)
+            self.jobs[job_id] = job
+        threading.Thread(target=self._drive, args=(job,), name=f'job-{job_id}', daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel_event.set()
+        return job
+
+    def evict_finished(self, reserve_rows=0):
+        """
+        Removes finished jobs older than FINISHED_JOB_TTL_S, the oldest beyond MAX_FINISHED_JOBS,
+        and further oldest ones while the spool cannot take reserve_rows more rows.
+        """
+        now = time.time()
+        with self.lock:
+            finished = sorted((job for job in self.jobs.values() if job.finished is not None),
+                              key=lambda job: job.finished)
+            excess = len(finished) - MAX_FINISHED_JOBS
+            over_budget = sum(job.spooled_rows() for job in self.jobs.values()) + reserve_rows - self.max_spooled_rows
+            evicted = []
+            for i, job in enumerate(finished):
+                if i < excess or now - job.finished > FINISHED_JOB_TTL_S or over_budget > 0:
+                    evicted.append(job)
+                    over_budget -= job.spooled_rows()
+            for job in evicted:
+                del self.jobs[job.id]
+        for job in evicted:
+            shutil.rmtree(job.spool_dir, ignore_errors=True)
+
+    def _discard_pool(self, pool):
+        """Drops a broken pool so the next _get_pool() starts a fresh one."""
+        with self.lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def delete(self, job_id):
+        """Cancels the job if needed and removes it and its spooled results."""
+        with self.lock:
+            job = self.jobs.pop(job_id, None)
+        if job is not None:
+            job.cancel_event.set()
+            shutil.rmtree(job.spool_dir, ignore_errors=True)
+        return job
+
+    def _drive(self, job):
+        pool = None
+        pending = set()
+        next_chunk = 0
+        try:
+            # Inside the try, so a pool that cannot be created fails the job instead of
+            # leaving it queued (and holding an admission slot) forever
+            pool = self._get_pool()
+            with job.lock:
+                job.state = 'running'
+                job.started = time.time()
+            while next_chunk < job.num_chunks or pending:
+                while (next_chunk < job.num_chunks and len(pending) < self.max_workers
+                       and not job.cancel_event.is_set()):
+                    pending.add(pool.submit(_run_chunk, *job.chunk_args(next_chunk)))
+                    next_chunk += 1
+                if job.cancel_event.is_set():
+                    for future in pending:
+                        future.cancel()
+                    pending = {future for future in pending if not future.cancelled()}
+                    if not pending:
+                        break
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if not future.cancelled():
+                        job.record_chunk(*future.result())
+            final_state = 'cancelled' if job.cancel_event.is_set() and job.rows_done < job.total_rows else 'completed'
+            error = None
+        except Exception as e:
+            for future in pending:
+                future.cancel()
+            if isinstance(e, BrokenProcessPool) and pool is not None:
+                # A worker died (e.g. OOM kill); later jobs must not inherit the dead pool
+                self._discard_pool(pool)
+            final_state = 'failed'
+            error = str(e)
+            print(f"Exception in job {job.id}: {e}")
+        with job.lock:
+            job.state = final_state
+            job.error = error
+            job.finished = time.time()
+            # Inputs are no longer needed; results live in the spool
+            job.axes = None
+            job.columns = None
+        self.evict_finished()
+
+    def shutdown(self):
+        """Cancels all jobs, stops the pool and removes every job's spooled results."""
+        with self.lock:
+            jobs, self.jobs = list(self.jobs.values()), {}
+            pool, self._pool = self._pool, None
+        for job in jobs:
+            job.cancel_event.set()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        for job in jobs:
+            shutil.rmtree(job.spool_dir, ignore_errors=True)
@@ -103,107 +103,127 @@ def minislot_capacity(K_symbols, current_modulation_order, pattern_array_index):
     return ms_capacity_bits
 
 
-def estimate_ofdma_throughput(
-    spectrum,           # Start frequency in MHz
-    mod_order,          # Modulation order (bits/symbol)
-    spacing,            # Subcarrier spacing in kHz
-    guard,              # Guard band in MHz
-    exclude             # Excluded spectrum in MHz
-):
+# --- Constants (Hardcoded for estimate_ofdma_throughput) ---
+# These values are based on the 'fixed_...' variables in the original script's __main__ block.
+# Some are made conditional on the subcarrier spacing for more realistic scenarios.
+US_CHANNEL_WIDTH_MHZ_50KHZ = 32.0 # Typical for 50kHz spacing
+US_CHANNEL_WIDTH_MHZ_25KHZ = 19.2 # Typical for 25kHz spacing (e.g. 960 subcarriers * 25kHz = 24MHz, less guard)
+                                  # Or 6.4MHz, 12.8MHz, 19.2MHz, 25.6MHz are common widths.
+US_PILOT_PATTERN_50KHZ = 4        # 1-based (e.g., P4 for 50kHz, maps to array index 3)
+US_PILOT_PATTERN_25KHZ = 8        # 1-based (e.g., P8 for 25kHz, maps to array index 14 via 8-1+7)
+US_MINISLOT_SUBCARRIERS_Q_50KHZ = 8  # Subcarriers per symbol in a minislot for 50kHz
+US_MINISLOT_SUBCARRIERS_Q_25KHZ = 16 # Subcarriers per symbol in a minislot for 25kHz
+US_K_NBI_50KHZ = 2                # NBI exclusion factor for 50kHz
+US_K_NBI_25KHZ = 3                # NBI exclusion factor for 25kHz
+US_SAMPLING_RATE_MSPS = 102.4
+US_CYCLIC_PREFIX_SAMPLES = 192.0  # Use float for consistency in division
+US_MINISLOT_SYMBOLS_K = 36
+US_NUM_CONT_LEGACY = 1
+US_EXCLUDED_NBI = 0
+US_ADDNL_EDGE_MINISLOT = 0
+US_NUM_GRANTS_IN_PROFILE = 38     # This might also ideally vary with profile/channel width
+US_SUBCARRIERS_PER_EXCL_GAP = 4.0 # Subcarriers lost to minislot alignment at each excluded spectrum gap
+
+
+def ofdma_minislot_layout(spectrum, spacing, guard, exclude):
     """
-    Calculates the upstream OFDMA channel capacity (profile rate in Mbps)
-    based on the 5 specified input parameters. Other necessary parameters are hardcoded
-    or derived internally.
+    Derives the minislot layout of an upstream OFDMA channel, independent of the
+    modulation order, pilot pattern and K used to fill it.
 
     Args:
         spectrum (float): Start frequency of the OFDMA channel in MHz.
-        mod_order (int): Modulation order (e.g., bits per symbol, like 10 for 1024-QAM).
         spacing (float): Subcarrier spacing in kHz (e.g., 25 or 50).
         guard (float): Guard band in MHz.
         exclude (float): Excluded spectrum in MHz.
 
     Returns:
-        float: The calculated profile rate in Mbps.
+        tuple: (num_body_minislots, num_edge_minislots, minislot_subcarriers_q,
+                actual_symbol_period_usec). The minislot counts are 0 if the
+                inputs leave no usable subcarriers.
     """
     # Map inputs to internal variable names with units for clarity
     spectrum_mhz = spectrum
-    # mod_order is used directly
     spacing_khz = spacing
     guard_mhz = guard
     exclude_mhz = exclude
 
-    # --- Hardcoded parameters ---
-    # These values are based on the 'fixed_...' variables in the original script's __main__ block.
-    # Some are made conditional on 'spacing_khz' for more realistic scenarios.
-
-    default_channel_width_mhz_50khz = 32.0 # Typical for 50kHz spacing
-    default_channel_width_mhz_25khz = 19.2 # Typical for 25kHz spacing (e.g. 960 subcarriers * 25kHz = 24MHz, less guard)
-                                           # Or 6.4MHz, 12.8MHz, 19.2MHz, 25.6MHz are common widths.
-    
-    us_pilot_pattern_idx_50khz = 4   # 1-based (e.g., P4 for 50kHz, maps to array index 3)
-    us_pilot_pattern_idx_25khz = 8   # 1-based (e.g., P8 for 25kHz, maps to array index 14 via 8-1+7)
-
     if spacing_khz == 25:
-        derived_channel_width_mhz = default_channel_width_mhz_25khz
-        us_pilot_pattern_idx = us_pilot_pattern_idx_25khz
-        us_minislot_subcarriers_q = 16 # Subcarriers per symbol in a minislot for 25kHz
-        k_nbi_factor = 3               # NBI exclusion factor for 25kHz
+        derived_channel_width_mhz = US_CHANNEL_WIDTH_MHZ_25KHZ
+        us_minislot_subcarriers_q = US_MINISLOT_SUBCARRIERS_Q_25KHZ
+        k_nbi_factor = US_K_NBI_25KHZ
     else: # Default to 50kHz parameters
-        derived_channel_width_mhz = default_channel_width_mhz_50khz
-        us_pilot_pattern_idx = us_pilot_pattern_idx_50khz
-        us_minislot_subcarriers_q = 8  # Subcarriers per symbol in a minislot for 50kHz
-        k_nbi_factor = 2               # NBI exclusion factor for 50kHz
+        derived_channel_width_mhz = US_CHANNEL_WIDTH_MHZ_50KHZ
+        us_minislot_subcarriers_q = US_MINISLOT_SUBCARRIERS_Q_50KHZ
+        k_nbi_factor = US_K_NBI_50KHZ
 
     end_frequency_mhz = spectrum_mhz + derived_channel_width_mhz
-    
-    # Other fixed parameters
-    us_sampling_rate_msps = 102.4
-    us_cyclic_prefix_samples = 192.0 # Use float for consistency in division
-    us_minislot_symbols_k_val = 36
-    us_num_cont_legacy_val = 1
-    us_excluded_nbi_val = 0
-    us_addnl_edge_minislot_val = 0
-    us_num_grants_in_profile_val = 38 # This might also ideally vary with profile/channel width
-
-    # --- Start of calculation logic (adapted from previous full-parameter version) ---
+
     us_occupied_spectrum_mhz = end_frequency_mhz - spectrum_mhz
-    if us_occupied_spectrum_mhz <= 0:
-        return 0.0
+    if us_occupied_spectrum_mhz <= 0 or US_SAMPLING_RATE_MSPS == 0 or spacing_khz == 0:
+        return 0, 0, us_minislot_subcarriers_q, 0.0
 
-    if us_sampling_rate_msps == 0: return 0.0
-    us_cyclic_prefix_usec = us_cyclic_prefix_samples / us_sampling_rate_msps
-    
-    if spacing_khz == 0: return 0.0
+    us_cyclic_prefix_usec = US_CYCLIC_PREFIX_SAMPLES / US_SAMPLING_RATE_MSPS
     us_symbol_period_usec = 1000.0 / spacing_khz
-    
     us_actual_symbol_period_usec = us_symbol_period_usec + us_cyclic_prefix_usec
-    if us_actual_symbol_period_usec == 0: return 0.0
-        
+    if us_actual_symbol_period_usec == 0:
+        return 0, 0, us_minislot_subcarriers_q, 0.0
+
     us_total_subcarriers = 1000.0 * us_occupied_spectrum_mhz / spacing_khz
     us_excluded_subcarriers_bands = 1000.0 * (exclude_mhz + guard_mhz) / spacing_khz
-    us_excluded_subcarriers = us_excluded_subcarriers_bands + (us_excluded_nbi_val * k_nbi_factor)
-    
-    us_num_of_excl_spectrum_gaps = us_excluded_nbi_val + us_num_cont_legacy_val
+    us_excluded_subcarriers = us_excluded_subcarriers_bands + (US_EXCLUDED_NBI * k_nbi_factor)
+
+    us_num_of_excl_spectrum_gaps = US_EXCLUDED_NBI + US_NUM_CONT_LEGACY
     us_actual_signal_subcarriers = us_total_subcarriers - us_excluded_subcarriers
 
-    if us_actual_signal_subcarriers <= 0: return 0.0
+    if us_actual_signal_subcarriers <= 0:
+        return 0, 0, us_minislot_subcarriers_q, us_actual_symbol_period_usec
 
     us_temp_num_minislots = math.floor(us_actual_signal_subcarriers / us_minislot_subcarriers_q)
-    
-    if us_actual_signal_subcarriers == 0: us_minislot_efficiency = 0.0
-    else:
-        us_minislot_efficiency = (us_actual_signal_subcarriers - us_num_of_excl_spectrum_gaps * 4.0) / us_actual_signal_subcarriers
-    
+    us_minislot_efficiency = (us_actual_signal_subcarriers - us_num_of_excl_spectrum_gaps * US_SUBCARRIERS_PER_EXCL_GAP) / us_actual_signal_subcarriers
+
     us_num_minislots = round(us_minislot_efficiency * us_temp_num_minislots)
-    if us_num_minislots <= 0: return 0.0
+    if us_num_minislots <= 0:
+        return 0, 0, us_minislot_subcarriers_q, us_actual_symbol_period_usec
 
-    us_num_of_edge_minislots = us_num_grants_in_profile_val + us_addnl_edge_minislot_val
+    us_num_of_edge_minislots = US_NUM_GRANTS_IN_PROFILE + US_ADDNL_EDGE_MINISLOT
     us_num_of_body_minislots = us_num_minislots - us_num_of_edge_minislots
 
     if us_num_of_body_minislots < 0:
         us_num_of_edge_minislots = us_num_minislots
         us_num_of_body_minislots = 0
-    
+
+    return us_num_of_body_minislots, us_num_of_edge_minislots, us_minislot_subcarriers_q, us_actual_symbol_period_usec
+
+
+def estimate_ofdma_throughput(
+    spectrum,           # Start frequency in MHz
+    mod_order,          # Modulation order (bits/symbol)
+    spacing,            # Subcarrier spacing in kHz
+    guard,              # Guard band in MHz
+    exclude             # Excluded spectrum in MHz
+):
+    """
+    Calculates the upstream OFDMA channel capacity (profile rate in Mbps)
+    based on the 5 specified input parameters. Other necessary parameters are hardcoded
+    as module constants or derived internally.
+
+    Args:
+        spectrum (float): Start frequency of the OFDMA channel in MHz.
+        mod_order (int): Modulation order (e.g., bits per symbol, like 10 for 1024-QAM).
+        spacing (float): Subcarrier spacing in kHz (e.g., 25 or 50).
+        guard (float): Guard band in MHz.
+        exclude (float): Excluded spectrum in MHz.
+
+    Returns:
+        float: The calculated profile rate in Mbps.
+    """
+    us_num_of_body_minislots, us_num_of_edge_minislots, us_minislot_subcarriers_q, us_actual_symbol_period_usec = \
+        ofdma_minislot_layout(spectrum, spacing, guard, exclude)
+    if us_num_of_body_minislots + us_num_of_edge_minislots <= 0:
+        return 0.0
+
+    us_pilot_pattern_idx = US_PILOT_PATTERN_25KHZ if spacing == 25 else US_PILOT_PATTERN_50KHZ
+
     local_us_pilot_pattern_array_idx = us_pilot_pattern_idx - 1
     if us_minislot_subcarriers_q == 16: # For 25 kHz spacing
         local_us_pilot_pattern_array_idx = local_us_pilot_pattern_array_idx + 7
@@ -217,14 +237,14 @@ def estimate_ofdma_throughput(
 
 
     us_capacity_bits = (
-        (us_num_of_body_minislots * minislot_capacity(us_minislot_symbols_k_val, mod_order, body_minislot_pattern_idx)) +
-        (us_num_of_edge_minislots * minislot_capacity(us_minislot_symbols_k_val, mod_order, edge_minislot_pattern_idx))
+        (us_num_of_body_minislots * minislot_capacity(US_MINISLOT_SYMBOLS_K, mod_order, body_minislot_pattern_idx)) +
+        (us_num_of_edge_minislots * minislot_capacity(US_MINISLOT_SYMBOLS_K, mod_order, edge_minislot_pattern_idx))
     )
     
-    if us_minislot_symbols_k_val == 0 or us_actual_symbol_period_usec == 0:
+    if US_MINISLOT_SYMBOLS_K == 0 or us_actual_symbol_period_usec == 0:
         profile_rate_mbps = 0.0
     else:
-        profile_rate_mbps = us_capacity_bits / (us_minislot_symbols_k_val * us_actual_symbol_period_usec)
+        profile_rate_mbps = us_capacity_bits / (US_MINISLOT_SYMBOLS_K * us_actual_symbol_period_usec)
     
     return profile_rate_mbps
 
@@ -0,0 +1,224 @@
+"""
+Upstream OFDMA pilot-pattern and minislot-K optimizer.
+
+estimate_ofdma_throughput always uses P4 (50 kHz) or P8 (25 kHz) with K = 36. This module
+evaluates every valid body/edge pattern pair from minislot_patterns, every K and every
+modulation order for each channel of a batch, discards configurations that violate the
+caller's robustness constraints, and returns the capacity-maximizing configuration.
+
+Valid pattern pairs: the body minislots use a non-complimentary-pilot pattern and the edge
+minislots use the complimentary-pilot version of the same pattern (body index + 7), with Q
+matching the channel's subcarrier spacing. That is 7 pairs per spacing, 14 in total,
+covering all 28 entries of minislot_patterns.
+
+Requires NumPy (imported here only; the estimation core does not depend on it).
+
+Example:
+    from ofdma_optimizer import optimize_ofdma_channels
+    best = optimize_ofdma_channels(spectrum=[10, 10], spacing=[50, 25], guard=0.8, exclude=0,
+                                   max_mod_order=[10, 8], min_pilot_density=0.01, k_max=18)
+    best['rate_mbps'], best['pattern_id'], best['k'], best['mod_order']
+"""
+import numpy as np
+
+from ofdma_estimation import minislot_patterns
+from batch_estimation import PATTERN_TABLE, minislot_capacity_batch, ofdma_minislot_layout_batch
+
+# Body pattern indices (no complimentary pilots); the edge pattern is body index + 7
+BODY_PATTERN_INDICES = np.array([i for i, p in enumerate(minislot_patterns) if p[2] == 0], dtype=np.int64)
+
+# K (symbols per minislot/frame) ranges allowed by DOCSIS 3.1 for each spacing
+K_RANGE_50KHZ = (6, 36)
+K_RANGE_25KHZ = (6, 18)
+
+DEFAULT_MOD_ORDERS = np.arange(1, 13) # BPSK (1) through 4096-QAM (12)
+DEFAULT_CHUNK_SIZE = 2048             # Channels evaluated per vectorized block
+
+
+def minislot_capacity_table(k_values, mod_orders, pattern_indices=None):
+    """
+    Vectorized minislot_capacity() over pattern x K x modulation order.
+
+    Args:
+        k_values (array-like): K values (symbols per minislot).
+        mod_orders (array-like): Modulation orders in bits/symbol.
+        pattern_indices (array-like, optional): 0-based indices into minislot_patterns.
+            Defaults to all 28 patterns.
+
+    Returns:
+        np.ndarray: Capacity in bits, shape (len(pattern_indices), len(k_values), len(mod_orders)).
+    """
+    if pattern_indices is None:
+        pattern_indices = np.arange(len(minislot_patterns))
+    return minislot_capacity_batch(
+        np.asarray(k_values)[None, :, None],
+        np.asarray(mod_orders)[None, None, :],
+        np.asarray(pattern_indices)[:, None, None]
+    )
+
+
+def _per_channel(value, n, dtype=np.float64):
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (n,))
+
+
+def optimize_ofdma_channels(
+    spectrum,                   # Start frequency in MHz, per channel or scalar
+    spacing,                    # Subcarrier spacing in kHz, per channel or scalar
+    guard,                      # Guard band in MHz, per channel or scalar
+    exclude,                    # Excluded spectrum in MHz, per channel or scalar
+    max_mod_order=12,           # Highest modulation order the channel supports
+    min_pilot_density=0.0,      # Minimum pilot fraction of body minislot resource elements
+    k_min=None,                 # Lower bound on K (default: DOCSIS minimum for the spacing)
+    k_max=None,                 # Upper bound on K, e.g. for latency (default: DOCSIS maximum)
+    allowed_pattern_ids=None,   # Optional iterable of permitted pattern IDs (1-14)
+    mod_orders=DEFAULT_MOD_ORDERS,
+    chunk_size=DEFAULT_CHUNK_SIZE
+):
+    """
+    Finds the capacity-maximizing (pattern pair, K, modulation order) for each channel.
+
+    Channel geometry (minislot counts, symbol period) follows ofdma_minislot_layout. At 50 kHz,
+    restricting the search to the estimator's configuration (pattern 4, K = 36) reproduces
+    estimate_ofdma_throughput exactly. At 25 kHz the estimator uses K = 36, which is outside
+    K_RANGE_25KHZ, so that configuration is never evaluated here and rates are not comparable.
+    Channels with no minislots (e.g. guard/exclude covering the channel) are infeasible.
+
+    Robustness constraints (scalars or one value per channel):
+        max_mod_order: configurations with a higher modulation order are rejected.
+        min_pilot_density: (Pilots_P + Pilots_CP) / (K * Q) of the body pattern must be at
+            least this value; denser pilots track more delay spread and ingress.
+        k_min, k_max: K bounds, intersected with the DOCSIS range for the spacing.
+        allowed_pattern_ids: restricts the pattern pairs considered (same for all channels).
+
+    Returns:
+        dict of np.ndarray, one entry per channel:
+            'rate_mbps': best profile rate (0.0 where nothing is feasible),
+            'feasible': whether any configuration met the constraints,
+            'body_pattern_idx', 'edge_pattern_idx': 0-based minislot_patterns indices (-1 if infeasible),
+            'pattern_id': pilot pattern ID of the pair (-1 if infeasible),
+            'k', 'mod_order': chosen K and modulation order (0 if infeasible),
+            'num_body_minislots', 'num_edge_minislots': channel layout.
+    """
+    spectrum, spacing, guard, exclude, max_mod_order, min_pilot_density = (
+        np.ravel(a) for a in np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(v, dtype=np.float64))
+              for v in (spectrum, spacing, guard, exclude, max_mod_order, min_pilot_density))
+        )
+    )
+    n = spectrum.size
+    mod_orders = np.asarray(mod_orders, dtype=np.float64)
+
+    # Channel layout does not depend on pattern, K or modulation order
+    num_body, num_edge, q_channel, symbol_period = ofdma_minislot_layout_batch(spectrum, spacing, guard, exclude)
+
+    is_25khz = spacing == 25
+    k_lo = np.where(is_25khz, K_RANGE_25KHZ[0], K_RANGE_50KHZ[0])
+    k_hi = np.where(is_25khz, K_RANGE_25KHZ[1], K_RANGE_50KHZ[1])
+    if k_min is not None:
+        k_lo = np.maximum(k_lo, _per_channel(k_min, n))
+    if k_max is not None:
+        k_hi = np.minimum(k_hi, _per_channel(k_max, n))
+    k_values = np.arange(min(K_RANGE_25KHZ[0], K_RANGE_50KHZ[0]), max(K_RANGE_25KHZ[1], K_RANGE_50KHZ[1]) + 1)
+
+    body_idx = BODY_PATTERN_INDICES
+    if allowed_pattern_ids is not None:
+        allowed = np.isin(PATTERN_TABLE[body_idx, 0], np.asarray(list(allowed_pattern_ids)))
+        body_idx = body_idx[allowed]
+
+    # (pairs, K, mods) capacity tables, shared by every channel
+    body_cap = minislot_capacity_table(k_values, mod_orders, body_idx)
+    edge_cap = minislot_capacity_table(k_values, mod_orders, body_idx + 7)
+    pair_q = PATTERN_TABLE[body_idx, 1]
+    body_pilots = PATTERN_TABLE[body_idx, 3] + PATTERN_TABLE[body_idx, 4]
+    pilot_density = body_pilots[:, None] / (k_values[None, :] * pair_q[:, None])   # (pairs, K)
+    data_ok = (k_values[None, :] * pair_q[:, None] - body_pilots[:, None]) > 0     # (pairs, K)
+
+    result = {
+        'rate_mbps': np.zeros(n),
+        'feasible': np.zeros(n, dtype=bool),
+        'body_pattern_idx': np.full(n, -1, dtype=np.int64),
+        'edge_pattern_idx': np.full(n, -1, dtype=np.int64),
+        'pattern_id': np.full(n, -1, dtype=np.int64),
+        'k': np.zeros(n, dtype=np.int64),
+        'mod_order': np.zeros(n),
+        'num_body_minislots': num_body,
+        'num_edge_minislots': num_edge,
+    }
+    if n == 0 or len(body_idx) == 0:
+        return result
+
+    # Only pattern pairs whose Q matches the channel's spacing are valid, so evaluate each Q
+    # group against its own pairs
+    for q in np.unique(q_channel):
+        pairs = np.flatnonzero(pair_q == q)
+        channels = np.flatnonzero(q_channel == q)
+        if len(pairs) == 0:
+            continue
+        shape = (len(pairs), len(k_values), len(mod_orders))
+        group_body_cap = body_cap[pairs][None]
+        group_edge_cap = edge_cap[pairs][None]
+        static_ok = data_ok[pairs][None, :, :, None]
+        group_density = pilot_density[pairs][None, :, :, None]
+
+        for lo in range(0, len(channels), chunk_size):
+            ch = channels[lo:lo + chunk_size]
+            # Feasibility mask, shape (channels, pairs, K, mods)
+            feasible = (
+                static_ok &
+                (k_values[None, None, :, None] >= k_lo[ch, None, None, None]) &
+                (k_values[None, None, :, None] <= k_hi[ch, None, None, None]) &
+                (mod_orders[None, None, None, :] <= max_mod_order[ch, None, None, None]) &
+                (group_density >= min_pilot_density[ch, None, None, None]) &
+                (symbol_period[ch, None, None, None] > 0) &
+                (num_body[ch, None, None, None] + num_edge[ch, None, None, None] > 0)
+            )
+            rate = num_body[ch, None, None, None] * group_body_cap
+            rate += num_edge[ch, None, None, None] * group_edge_cap
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rate /= k_values[None, None, :, None] * symbol_period[ch, None, None, None]
+            rate[~feasible] = -np.inf
+
+            flat = rate.reshape(len(ch), -1)
+            best = np.argmax(flat, axis=1)
+            best_rate = flat[np.arange(len(ch)), best]
+            ok = np.isfinite(best_rate)
+            pair_i, k_i, mod_i = np.unravel_index(best, shape)
+            chosen_body = body_idx[pairs[pair_i]]
+
+            result['feasible'][ch] = ok
+            result['rate_mbps'][ch] = np.where(ok, best_rate, 0.0)
+            result['body_pattern_idx'][ch] = np.where(ok, chosen_body, -1)
+            result['edge_pattern_idx'][ch] = np.where(ok, chosen_body + 7, -1)
+            result['pattern_id'][ch] = np.where(ok, PATTERN_TABLE[chosen_body, 0], -1)
+            result['k'][ch] = np.where(ok, k_values[k_i], 0)
+            result['mod_order'][ch] = np.where(ok, mod_orders[mod_i], 0.0)
+
+    return result
+
+
+# --- Main execution block for testing ---
+if __name__ == "__main__":
+    import time
+    from ofdma_estimation import estimate_ofdma_throughput
+
+    print("--- Baseline (P4/P8, K=36) vs optimized configuration ---")
+    for spacing_khz, mod in ((50, 10), (25, 8)):
+        baseline = estimate_ofdma_throughput(10, mod, spacing_khz, 0.8, 0)
+        best = optimize_ofdma_channels(10, spacing_khz, 0.8, 0, max_mod_order=mod, min_pilot_density=0.01)
+        print(f"{spacing_khz}kHz, mod {mod}: baseline {baseline:.3f} Mbps -> "
+              f"P{best['pattern_id'][0]} K={best['k'][0]} mod {best['mod_order'][0]:g}: {best['rate_mbps'][0]:.3f} Mbps")
+
+    n_channels = 10000
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    best = optimize_ofdma_channels(
+        spectrum=10,
+        spacing=rng.choice([25, 50], n_channels),
+        guard=rng.uniform(0.2, 2.0, n_channels),
+        exclude=rng.uniform(0.0, 4.0, n_channels),
+        max_mod_order=rng.integers(6, 13, n_channels),
+        min_pilot_density=rng.uniform(0.0, 0.05, n_channels),
+    )
+    elapsed = time.perf_counter() - t0
+    print(f"\nOptimized {n_channels} channels in {elapsed * 1000:.1f} ms "
+          f"({best['feasible'].sum()} feasible, mean {best['rate_mbps'].mean():.3f} Mbps)")